@@ -0,0 +1,89 @@
+import os
+import sys
+import types
+from collections import namedtuple
+import psycopg2
+
+"""This module provides a stand-in for the bitdotio client backed by a local Postgres.
+
+Each bit.io repo "username/repo" is mapped onto a local schema of the same name, so the
+fully qualified names built by BitDotIOPandas resolve unchanged against the local server.
+"""
+
+# Override with a libpq connection string, e.g. "dbname=bench user=postgres host=localhost"
+DEFAULT_DSN = os.getenv('BENCH_PG_DSN', 'dbname=postgres host=localhost')
+
+# Mirrors the attributes BitDotIOPandas reads from the real client's table/repo objects
+Table = namedtuple('Table', ['current_name'])
+Repo = namedtuple('Repo', ['name'])
+
+
+class LocalBitDotIO:
+    """Minimal bitdotio client shim that hands out local psycopg2 connections.
+
+    Attributes:
+        dsn (str): The libpq connection string for the local Postgres server.
+    """
+
+    def __init__(self, api_key=None, dsn=None):
+        # api_key is accepted for signature compatibility and ignored
+        self.dsn = dsn if dsn else DEFAULT_DSN
+
+    def get_connection(self):
+        '''Gets a psycopg2 connection to the local Postgres server'''
+        return psycopg2.connect(self.dsn)
+
+    def list_tables(self, username, repo):
+        '''Lists tables in the schema standing in for a repo'''
+        sql = 'SELECT table_name FROM information_schema.tables WHERE table_schema = %s;'
+        return [Table(name) for name in self._fetch_column(sql, (f'{username}/{repo}',))]
+
+    def list_repos(self, username):
+        '''Lists the schemas standing in for a user's repos'''
+        sql = 'SELECT schema_name FROM information_schema.schemata WHERE schema_name LIKE %s;'
+        prefix = f'{username}/'
+        return [Repo(name[len(prefix):]) for name in self._fetch_column(sql, (prefix + '%',))]
+
+    def create_repo(self, username, repo):
+        '''Creates the schema standing in for a repo, if needed'''
+        self._execute(f'CREATE SCHEMA IF NOT EXISTS "{username}/{repo}";')
+
+    def drop_repo(self, username, repo):
+        '''Drops the schema standing in for a repo and everything in it'''
+        self._execute(f'DROP SCHEMA IF EXISTS "{username}/{repo}" CASCADE;')
+
+    def _fetch_column(self, sql, params):
+        '''Runs a query and returns the first column of every row'''
+        conn = self.get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                return [row[0] for row in cur.fetchall()]
+        finally:
+            conn.close()
+
+    def _execute(self, sql):
+        '''Runs a statement and commits'''
+        conn = self.get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def install(dsn=None):
+    '''Registers a fake "bitdotio" module so BitDotIOPandas connects to the local Postgres.
+
+    Must be called before bitdotio_pandas is imported.
+
+    Args:
+        dsn (str): Optional libpq connection string, defaults to ENV "BENCH_PG_DSN".
+    Returns:
+        The LocalBitDotIO client every BitDotIOPandas instance will share settings with.
+    '''
+    module = types.ModuleType('bitdotio')
+    module.bitdotio = lambda api_key: LocalBitDotIO(api_key, dsn)
+    sys.modules['bitdotio'] = module
+    return LocalBitDotIO(dsn=dsn)
@@ -0,0 +1,314 @@
+"""Benchmark suite for BitDotIOPandas and the labeler queries against a local Postgres.
+
+The bitdotio client is replaced by local_bitdotio, so every connection BitDotIOPandas opens goes
+to the local server instead of bit.io. Results are written as JSON and can be compared between runs:
+
+    python run_benchmarks.py --output results/before.json
+    python run_benchmarks.py --output results/after.json --baseline results/before.json
+
+By default results go to a timestamped file in benchmarks/results/, which git ignores.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'bitdotio_labeler'))
+
+import local_bitdotio
+
+# The local schema "bench/bitdotio_pandas" stands in for the bit.io repo
+USERNAME = 'bench'
+REPO = 'bitdotio_pandas'
+LABEL_CONTRIBUTOR = 'bench_user'
+RESULTS_DIR = os.path.join(HERE, 'results')
+
+
+def make_frame(n_rows, seed=0):
+    '''Builds a synthetic dataframe covering the dtypes handled by DTYPE_MAP'''
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(n_rows, dtype='int64'),
+        'value': rng.random(n_rows),
+        'count': rng.integers(0, 1000, n_rows, dtype='int32'),
+        'flag': rng.random(n_rows) > 0.5,
+        'label': rng.choice(['alpha', 'beta', 'gamma', 'delta'], n_rows).astype(object),
+        'created': pd.Timestamp('2021-01-01') + pd.to_timedelta(rng.integers(0, 86400 * 365, n_rows), unit='s')
+    })
+
+
+def make_labeler_frames(n_rows, num_overlap, labeled_fraction=0.1, seed=0):
+    '''Builds a synthetic comments sample and label table shaped like the labeler's tables'''
+    rng = np.random.default_rng(seed)
+    df_dataset = pd.DataFrame({
+        'id': np.arange(n_rows, dtype='int64'),
+        'body': rng.choice(['to the moon', 'buy the dip', 'paper hands', 'diamond hands'], n_rows).astype(object),
+        'subset': (np.arange(n_rows) < num_overlap).astype('int64'),
+        'num_manual_labels': np.zeros(n_rows, dtype='int64'),
+        'manual_label': np.full(n_rows, np.nan)
+    })
+    n_labels = int(n_rows * labeled_fraction)
+    df_labels = pd.DataFrame({
+        'id': rng.integers(0, max(n_rows, 1), n_labels, dtype='int64'),
+        'contributor': rng.choice([LABEL_CONTRIBUTOR, 'other_user'], n_labels).astype(object),
+        'manual_label': rng.choice([0.0, 0.5, 1.0], n_labels),
+        'timestamp': datetime.now().strftime("%Y/%m/%d, %H:%M:%S")
+    })
+    return df_dataset, df_labels
+
+
+def time_call(fn, repeat, setup=None, check=None):
+    '''Times fn() repeat times, calling the untimed setup() before and check(result) after each run'''
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+        if check is not None:
+            check(result)
+    return timings
+
+
+def check_frame(df):
+    '''Fails the run if a read_sql call printed an error instead of returning a frame'''
+    if df is None:
+        raise RuntimeError('Query failed, see the error printed above.')
+
+
+def count_rows(bpd, table):
+    '''Counts the rows of a table in the benchmark repo'''
+    df = bpd.read_sql(f'SELECT COUNT(*) AS n FROM {bpd._get_fully_qualified(USERNAME, REPO, table)};')
+    check_frame(df)
+    return int(df['n'].iloc[0])
+
+
+def check_rows(expected, n_rows, what):
+    '''Fails the run if fewer or more rows than expected were written or read'''
+    if n_rows != expected:
+        raise RuntimeError(f'{what}: expected {expected} rows, got {n_rows}.')
+
+
+def record(results, benchmark, params, timings, n_rows=None):
+    '''Appends one benchmark result, with throughput if a row count is given'''
+    result = {
+        'benchmark': benchmark,
+        'params': params,
+        'timings_s': timings,
+        'best_s': min(timings),
+        'median_s': statistics.median(timings)
+    }
+    if n_rows is not None:
+        result['rows'] = n_rows
+        result['rows_per_s'] = n_rows / result['median_s'] if result['median_s'] > 0 else None
+    results.append(result)
+    print(f"{benchmark:<24} {json.dumps(params):<48} median {result['median_s']:.4f}s")
+
+
+def drop_if_exists(bpd, table):
+    '''Drops a table from the benchmark repo if present'''
+    if table in bpd.list_tables():
+        bpd.delete_table(table)
+
+
+def bench_connection(bpd, results, repeat):
+    '''Measures the fixed per-call overhead of opening connections and running trivial queries'''
+    def connect_and_close():
+        bpd._connect().close()
+
+    record(results, 'connection.connect', {}, time_call(connect_and_close, repeat))
+    record(results, 'connection.sql', {}, time_call(lambda: bpd.sql('SELECT 1;'), repeat))
+    record(results, 'connection.read_sql', {},
+           time_call(lambda: bpd.read_sql('SELECT 1 AS one;'), repeat, check=check_frame))
+    record(results, 'connection.list_tables', {}, time_call(bpd.list_tables, repeat))
+
+
+def bench_upload(bpd, results, sizes, chunksizes, repeat):
+    '''Measures to_table throughput across dataset sizes and chunksizes'''
+    table = 'bench_upload'
+    for n_rows in sizes:
+        df = make_frame(n_rows)
+        for chunksize in list(chunksizes) + [None]:
+            if chunksize is not None and chunksize >= n_rows:
+                continue
+            timings = time_call(lambda: bpd.to_table(df, table, chunksize=chunksize), repeat,
+                                setup=lambda: drop_if_exists(bpd, table),
+                                check=lambda _: check_rows(n_rows, count_rows(bpd, table), 'to_table'))
+            record(results, 'upload.to_table', {'n_rows': n_rows, 'chunksize': chunksize}, timings, n_rows)
+    drop_if_exists(bpd, table)
+
+
+def stream_table(bpd, table, chunksize):
+    '''Reads a table through a single server-side cursor, one chunk at a time'''
+    fully_qualified = bpd._get_fully_qualified(USERNAME, REPO, table)
+    conn = bpd._connect()
+    try:
+        with conn.cursor(name='bench_stream') as cur:
+            cur.itersize = chunksize
+            cur.execute(f'SELECT * FROM {fully_qualified};')
+            n_rows = 0
+            while True:
+                rows = cur.fetchmany(chunksize)
+                if not rows:
+                    break
+                columns = [col[0] for col in cur.description]
+                n_rows += pd.DataFrame(rows, columns=columns).shape[0]
+            return n_rows
+    finally:
+        conn.close()
+
+
+def bench_read(bpd, results, sizes, chunksizes, repeat):
+    '''Measures full, paginated and streamed read throughput across dataset sizes'''
+    table = 'bench_read'
+    for n_rows in sizes:
+        drop_if_exists(bpd, table)
+        bpd.to_table(make_frame(n_rows), table, chunksize=max(chunksizes))
+        check_rows(n_rows, count_rows(bpd, table), 'to_table')
+
+        def check_read(result):
+            check_frame(result)
+            check_rows(n_rows, result.shape[0], 'read_table')
+
+        def check_total(total):
+            check_rows(n_rows, total, 'chunked read')
+
+        record(results, 'read.read_table', {'n_rows': n_rows, 'chunksize': None},
+               time_call(lambda: bpd.read_table(table), repeat, check=check_read), n_rows)
+        for chunksize in chunksizes:
+            if chunksize >= n_rows:
+                continue
+
+            def read_paginated():
+                return sum(chunk.shape[0] for chunk in bpd.read_table(table, chunksize=chunksize))
+
+            def read_batches():
+                return sum(chunk.shape[0] for chunk in bpd.table(table).iter_batches(chunksize))
+
+            record(results, 'read.read_table', {'n_rows': n_rows, 'chunksize': chunksize},
+                   time_call(read_paginated, repeat, check=check_total), n_rows)
+            record(results, 'read.server_side_cursor', {'n_rows': n_rows, 'chunksize': chunksize},
+                   time_call(lambda: stream_table(bpd, table, chunksize), repeat, check=check_total), n_rows)
+            record(results, 'read.iter_batches', {'n_rows': n_rows, 'chunksize': chunksize},
+                   time_call(read_batches, repeat, check=check_total), n_rows)
+    drop_if_exists(bpd, table)
+
+
+def bench_labeler(bpd, results, sizes, repeat):
+    '''Measures the labeler's batch and update queries at increasing dataset sizes'''
+    from config import CONFIG
+    import queries
+
+    # Point the labeler queries at the benchmark repo
+    CONFIG['REPO_OWNER'], CONFIG['REPO'] = USERNAME, REPO
+    for n_rows in sizes:
+        df_dataset, df_labels = make_labeler_frames(n_rows, CONFIG['NUM_OVERLAP'])
+        for table, df in [(CONFIG['DATASET_TABLE'], df_dataset), (CONFIG['LABEL_TABLE'], df_labels)]:
+            drop_if_exists(bpd, table)
+            bpd.to_table(df, table, chunksize=100000)
+            check_rows(df.shape[0], count_rows(bpd, table), 'to_table')
+
+        def check_update(_):
+            # sql() only prints errors, so confirm the update labeled every labeled id
+            df_status = bpd.read_sql(queries.get_status_sql())
+            check_frame(df_status)
+            check_rows(df_labels['id'].nunique(), int(df_status['num_labeled'].iloc[0]), 'update')
+
+        params = {'n_rows': n_rows, 'n_labels': df_labels.shape[0]}
+        record(results, 'labeler.batch', params,
+               time_call(lambda: bpd.read_sql(queries.get_batch_sql(LABEL_CONTRIBUTOR)), repeat, check=check_frame))
+        record(results, 'labeler.update', params,
+               time_call(lambda: bpd.sql(queries.get_update_sql()), repeat, check=check_update))
+        record(results, 'labeler.status', params,
+               time_call(lambda: bpd.read_sql(queries.get_status_sql()), repeat, check=check_frame))
+    for table in [CONFIG['DATASET_TABLE'], CONFIG['LABEL_TABLE']]:
+        drop_if_exists(bpd, table)
+
+
+def result_key(result):
+    '''Identifies a result across runs'''
+    return result['benchmark'], json.dumps(result['params'], sort_keys=True)
+
+
+def compare(results, baseline_path):
+    '''Prints the median time of each benchmark relative to a previous run'''
+    with open(baseline_path) as f:
+        baseline = {result_key(result): result for result in json.load(f)['results']}
+    print(f'\nComparison against {baseline_path} (ratio < 1 is faster):')
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if previous is None or previous['median_s'] == 0:
+            continue
+        ratio = result['median_s'] / previous['median_s']
+        benchmark, params = result_key(result)
+        print(f"{benchmark:<24} {params:<48} {previous['median_s']:.4f}s -> {result['median_s']:.4f}s ({ratio:.2f}x)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dsn', default=None, help='libpq connection string, defaults to ENV "BENCH_PG_DSN"')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--chunksizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', choices=['connection', 'upload', 'read', 'labeler'],
+                        default=['connection', 'upload', 'read', 'labeler'])
+    parser.add_argument('--output', default=None, help='Results JSON path, defaults to a timestamped file in results/')
+    parser.add_argument('--baseline', default=None, help='Previous results JSON to compare against')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    client = local_bitdotio.install(args.dsn)
+    # Imported after the shim is installed so BitDotIOPandas picks up the local client
+    from bitdotio_pandas import BitDotIOPandas
+
+    client.drop_repo(USERNAME, REPO)
+    client.create_repo(USERNAME, REPO)
+    bpd = BitDotIOPandas(api_key='local', username=USERNAME, repo=REPO)
+
+    results = []
+    try:
+        if 'connection' in args.only:
+            bench_connection(bpd, results, args.repeat)
+        if 'upload' in args.only:
+            bench_upload(bpd, results, args.sizes, args.chunksizes, args.repeat)
+        if 'read' in args.only:
+            bench_read(bpd, results, args.sizes, args.chunksizes, args.repeat)
+        if 'labeler' in args.only:
+            bench_labeler(bpd, results, args.sizes, args.repeat)
+    finally:
+        client.drop_repo(USERNAME, REPO)
+
+    if args.output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        args.output = os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'args': vars(args)
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f'\nWrote {len(results)} results to {args.output}')
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,9 @@ import bitdotio
 import psycopg2
 from getpass import getpass
 import os, io
+import itertools
+import queue
+import threading
 
 """This module provides a wrapper class to integrate bit.io with common Pandas dataframe operations."""
 
@@ -33,6 +36,48 @@ class BitDotIOPandas:
         'datetime64[ns, UTC]': 'TIMESTAMP WITH TIME ZONE',
         'datetime64[ns, US/Eastern]': 'TIMESTAMP WITH TIME ZONE'
     }
+
+    # Nullable pandas dtypes used to keep integer columns integral when a later chunk has nulls
+    NULLABLE_INT_MAP = {
+        'int8': 'Int8',
+        'int16': 'Int16',
+        'int32': 'Int32',
+        'int64': 'Int64',
+        'uint8': 'UInt8',
+        'uint16': 'UInt16',
+        'uint32': 'UInt32',
+        'uint64': 'UInt64'
+    }
+
+    # Aggregations supported by aggregate, keyed by name (or a function's __name__, e.g. np.sum, len)
+    AGG_MAP = {
+        'sum': 'SUM({})',
+        'mean': 'AVG({})',
+        'avg': 'AVG({})',
+        'min': 'MIN({})',
+        'max': 'MAX({})',
+        # count skips NULLs like pandas count, len and size count every row
+        'count': 'COUNT({})',
+        'len': 'COUNT(*)',
+        'size': 'COUNT(*)',
+        'nunique': 'COUNT(DISTINCT {})',
+        'median': 'PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY {})',
+        'std': 'STDDEV_SAMP({})',
+        'var': 'VAR_SAMP({})'
+    }
+
+    # date_trunc units for time buckets, also accepting pandas period aliases
+    BUCKET_MAP = {
+        'H': 'hour', 'hour': 'hour',
+        'D': 'day', 'day': 'day',
+        'W': 'week', 'week': 'week',
+        'M': 'month', 'month': 'month',
+        'Q': 'quarter', 'quarter': 'quarter',
+        'Y': 'year', 'A': 'year', 'year': 'year'
+    }
+
+    # Comparison operators accepted in where clauses
+    WHERE_OPS = ('=', '!=', '<>', '<', '<=', '>', '>=', 'like', 'ilike', 'in', 'not in', 'is null', 'is not null')
     
     def __init__(self, api_key=None, username=None, repo=None):
         if not api_key:
@@ -68,13 +113,13 @@ class BitDotIOPandas:
         username, _ = self._get_username_and_repo(username, None)
         return [table.name for table in self._b.list_repos(username)]
     
-    def read_sql(self, sql):
-        '''Query bit.io with SQL and return a pandas dataframe'''
+    def read_sql(self, sql, params=None):
+        '''Query bit.io with SQL and optional psycopg2 %s params and return a pandas dataframe'''
         try:
             # Connect to bit.io
             conn = self._connect()
             # Execute sql
-            return pd.read_sql(sql, conn)
+            return pd.read_sql(sql, conn, params=params)
         except Exception as e:
             print(e)
         finally:
@@ -111,6 +156,58 @@ class BitDotIOPandas:
                     i += 1
             return table_chunk_gen()
         
+    def aggregate(self, table, by=None, aggs=None, where=None, bucket=None, repo=None, username=None):
+        '''Runs a GROUP BY aggregation server-side and downloads only the aggregated rows.
+
+        Args:
+            table (str): The table name in bit.io.
+            by (list): Columns to group by. Optional, the whole table is one group if not provided.
+            aggs (dict): Maps columns to an aggregation name or function, or a list of them, e.g.
+                {'Bottles Sold': 'sum', 'Invoice/Item Number': len}. See AGG_MAP for supported
+                names. The key '*' with 'count' counts rows, as do len and size on any column.
+            where (dict or list): Optional filter, either {col: value} for equality (a list value
+                means IN, None means IS NULL) or a list of (col, op, value) tuples with op from
+                WHERE_OPS. Values are always passed as query parameters.
+            bucket (dict): Optional {col: unit} to truncate timestamp columns to a period
+                (e.g. 'month' or 'M') and group by it. See BUCKET_MAP for supported units.
+            repo (str): The repo name in bit.io. If not provided, must be set in object.
+            username (str): The username in bit.io. If not provided, must be set in object.
+        Returns:
+            A pandas DataFrame with one row per group, ordered by the group columns. Aggregated
+            columns keep their name, or are suffixed with the aggregation if a column has several.
+        '''
+        username, repo = self._get_username_and_repo(username, repo)
+        self._validate_repo_and_table(repo, username, table)
+        fully_qualified = self._get_fully_qualified(username, repo, table)
+        by = list(by) if by else []
+        bucket = bucket if bucket else {}
+        if not aggs:
+            raise ValueError('At least one aggregation must be provided in aggs.')
+
+        group_exprs = []
+        for col, unit in bucket.items():
+            if unit not in BitDotIOPandas.BUCKET_MAP:
+                raise ValueError(f'Unsupported bucket unit "{unit}". Try one of {list(BitDotIOPandas.BUCKET_MAP)}.')
+            quoted = self._quote_identifier(col)
+            group_exprs.append((f"date_trunc('{BitDotIOPandas.BUCKET_MAP[unit]}', {quoted})", quoted))
+        group_exprs += [(self._quote_identifier(col), self._quote_identifier(col)) for col in by if col not in bucket]
+
+        select = [f'{expr} AS {alias}' for expr, alias in group_exprs]
+        select += self._compile_aggs(aggs)
+        sql = f'SELECT {", ".join(select)} FROM {fully_qualified}'
+        where_sql, params = self._compile_where(where)
+        sql += where_sql
+        if group_exprs:
+            positions = ', '.join(str(i + 1) for i in range(len(group_exprs)))
+            sql += f' GROUP BY {positions} ORDER BY {positions}'
+        return self.read_sql(sql + ';', params)
+
+    def table(self, table, repo=None, username=None):
+        '''Gets a lazy handle on a table that only queries bit.io when materialized, see BitDotIOTable'''
+        username, repo = self._get_username_and_repo(username, repo)
+        self._validate_repo_and_table(repo, username, table)
+        return BitDotIOTable(self, table, repo, username)
+
     def delete_table(self, table, repo=None, username=None, limit=5):
         '''Deletes a table'''
         username, repo = self._get_username_and_repo(username, repo)
@@ -118,75 +215,104 @@ class BitDotIOPandas:
         fully_qualified = self._get_fully_qualified(username, repo, table)
         self.sql(f'DROP TABLE {fully_qualified};')
         
-    def sql(self, sql):
-        '''Run arbitrary SQL statements on bitdotio'''
+    def sql(self, sql, params=None):
+        '''Run arbitrary SQL statements on bitdotio, with optional psycopg2 %s params'''
         try:
-            # Connect to bit.io
-            conn = self._connect()
-            # Open cursor with bit.io server
-            cur = conn.cursor()
-            # Execute sql
-            cur.execute(sql)
-            # Close cursor
-            cur.close()
-            # Commit the changes (only relevent for write ops)
-            conn.commit()
+            self._execute(sql, params)
         except Exception as e:
             print(e)
-        finally:
-            if conn is not None:
-                conn.close()
 
     def to_table(self, df, table, repo=None, username=None, append=True, chunksize=None):
-        '''Write a dataframe to a bitdotio table, creating the table if necessary.
+        '''Write a dataframe, or an iterator of dataframes, to a bitdotio table, creating the table if necessary.
 
         One difference from a typical Pandas file operation is that we default to append,
         as a safer operation than truncate and insert (requires non-default argument).
 
+        An iterator of dataframes, e.g. from pd.read_csv(chunksize=...) or read_table(chunksize=...),
+        is uploaded with constant memory: the table schema is created from the first chunk, and
+        the next chunk is serialized in a background thread while the current one is copied,
+        holding at most a couple of serialized chunks at a time. Later chunks are cast to the
+        first chunk's integer and boolean dtypes. Chunks that fail to copy are rolled back and
+        skipped, and a ValueError is raised once the rest have been uploaded.
+
         Args:
-            df (Pandas DataFrame): The dataframe to upload.
+            df (Pandas DataFrame or iterable of DataFrames): The data to upload.
             table (str): The table name in bit.io. If not provided, must be set in object.
             repo (str): The repo name in bit.io. If not provided, must be set in object.
             username (str): The username in bit.io. If not provided, must be set in object.
             append (str): Whether to append (default) or truncate and then insert. Optional.
-            chunksize (int): Optional chunksize for uploading large tables, default None.
+            chunksize (int): Optional maximum rows per COPY for uploading large tables, default None.
         '''
         # TODO(doss): This is a very naive implementation, maybe can use SQLAlchemy or our own ingestor 
-        # TODO(doss): This should also support chunking for "big data" uploads
         username, repo = self._get_username_and_repo(username, repo)
         self._validate_repo(repo, username)
         fully_qualified = self._get_fully_qualified(username, repo, table)
 
+        frames = self._iter_frames(df, chunksize)
+        first = next(frames, None)
+        schema_df = df if isinstance(df, pd.DataFrame) else first
+        exists = table in self.list_tables(repo, username)
+        if schema_df is None and not exists:
+            # An empty iterator has no schema to create a table from
+            return
+
         # Create table if needed
-        if table not in self.list_tables(repo, username):
-            self._create_table(username, repo, table, df)
+        if not exists:
+            self._create_table(username, repo, table, schema_df)
 
-        # Truncate if needed
+        # Truncate if needed, also when replacing with an empty iterator
         if not append:
             self.sql(f"DELETE FROM {fully_qualified};")
-        # TODO(doss): look into more robust/performant implementation - SQLAlchemy?
-        # TODO(doss): this implementation lacks integrity control for partial insert with chunking
-        if chunksize is None:
-            chunksize = df.shape[0]
-        i = 0
-        while i * chunksize < df.shape[0]:
-            chunk_start, chunk_end = i * chunksize, (i + 1) * chunksize
-            buffer = io.StringIO()
-            df.iloc[chunk_start:chunk_end, :].to_csv(buffer, index=False, header=False, na_rep="null", line_terminator="\r\n")
-            buffer.seek(0)
-            try:
-                conn = self._connect()
-                cursor = conn.cursor()
-                cursor.copy_expert(f"COPY {fully_qualified} FROM STDIN delimiter ',' null as 'null' csv;", buffer)
-                conn.commit()
-            except (Exception, psycopg2.DatabaseError) as e:
-                print(e)
-                conn.rollback()
-            finally:
-                if conn is not None:
-                    conn.close()
-            i += 1
+        if first is not None:
+            self._copy_frames(fully_qualified, itertools.chain([first], frames), schema_df.dtypes)
         
+    def create_table_as(self, sql, table, repo=None, username=None, append=True, params=None):
+        '''Write the result of a SELECT query to a bitdotio table without downloading it.
+
+        Runs entirely server-side, as CREATE TABLE ... AS if the table does not exist yet, else
+        INSERT INTO ... SELECT, with the same append/truncate semantics as to_table.
+
+        Args:
+            sql (str): The SELECT query, e.g. over fully qualified tables in any visible repo.
+            table (str): The destination table name in bit.io.
+            repo (str): The destination repo name in bit.io. If not provided, must be set in object.
+            username (str): The destination username in bit.io. If not provided, must be set in object.
+            append (str): Whether to append (default) or truncate and then insert. Optional. The
+                query may read from the table it replaces.
+            params (list): Optional psycopg2 %s params for the query.
+        Raises:
+            psycopg2.Error: If the query fails, in which case nothing is written.
+        '''
+        username, repo = self._get_username_and_repo(username, repo)
+        self._validate_repo(repo, username)
+        self._create_or_insert(username, repo, table, sql.strip().rstrip(';'), params, append)
+
+    def copy_table(self, src, dst, columns=None, where=None, repo=None, username=None,
+                   dst_repo=None, dst_username=None, append=True):
+        '''Copy (a subset of) a table into another table server-side, e.g. between repos.
+
+        Args:
+            src (str): The source table name in bit.io.
+            dst (str): The destination table name in bit.io.
+            columns (list): Optional columns to copy, default all.
+            where (dict or list): Optional filter on source rows, as in aggregate.
+            repo (str): The source repo name in bit.io. If not provided, must be set in object.
+            username (str): The source username in bit.io. If not provided, must be set in object.
+            dst_repo (str): The destination repo name in bit.io. If not provided, must be set in object.
+            dst_username (str): The destination username in bit.io. If not provided, must be set in object.
+            append (str): Whether to append (default) or truncate and then insert. Optional. With
+                src and dst the same table, append=False filters the table in place.
+        Raises:
+            psycopg2.Error: If the copy fails, in which case nothing is written.
+        '''
+        handle = self.table(src, repo, username)
+        if columns:
+            handle = handle.select(*columns)
+        select_sql, params = handle.where(where).compile()
+        dst_username, dst_repo = self._get_username_and_repo(dst_username, dst_repo)
+        self._validate_repo(dst_repo, dst_username)
+        self._create_or_insert(dst_username, dst_repo, dst, select_sql, params, append, columns)
+
     def __repr__(self):
         return f'BitDotIOPandas Object: username= {self.username}, repo= {self.repo}'
         
@@ -204,6 +330,67 @@ class BitDotIOPandas:
         '''Constructs fully qualified table name from parts'''
         return f'"{username}/{repo}"."{table}"'
 
+    def _quote_identifier(self, name):
+        '''Quotes a column name for safe use in generated SQL'''
+        # Double '%' as well, since generated SQL is run with psycopg2 %s params
+        return '"' + str(name).replace('"', '""').replace('%', '%%') + '"'
+
+    def _compile_aggs(self, aggs):
+        '''Compiles {col: fn or [fns]} into aliased aggregate select expressions'''
+        exprs = []
+        for col, fns in aggs.items():
+            fns = fns if isinstance(fns, (list, tuple)) else [fns]
+            for fn in fns:
+                name = fn if isinstance(fn, str) else getattr(fn, '__name__', None)
+                if name not in BitDotIOPandas.AGG_MAP:
+                    raise ValueError(f'Unsupported aggregation "{fn}". Try one of {list(BitDotIOPandas.AGG_MAP)}.')
+                if col == '*':
+                    if name not in ('count', 'len', 'size'):
+                        raise ValueError('Only row counts are supported for "*".')
+                    exprs.append(f'COUNT(*) AS {self._quote_identifier("count")}')
+                    continue
+                alias = col if len(fns) == 1 else f'{col}_{name}'
+                expr = BitDotIOPandas.AGG_MAP[name].format(self._quote_identifier(col))
+                exprs.append(f'{expr} AS {self._quote_identifier(alias)}')
+        return exprs
+
+    def _normalize_where(self, where):
+        '''Converts a where dict or list of (col, op[, value]) tuples into (col, op, value) tuples'''
+        if not where:
+            return []
+        if not isinstance(where, dict):
+            return [tuple(condition) + (None,) * (3 - len(condition)) for condition in where]
+        conditions = []
+        for col, value in where.items():
+            if value is None:
+                conditions.append((col, 'is null', None))
+            elif isinstance(value, (list, tuple, set)):
+                conditions.append((col, 'in', value))
+            else:
+                conditions.append((col, '=', value))
+        return conditions
+
+    def _compile_where(self, where):
+        '''Compiles a where dict or list of (col, op, value) tuples into SQL and params'''
+        conditions = self._normalize_where(where)
+        if not conditions:
+            return '', []
+        clauses, params = [], []
+        for col, op, value in conditions:
+            op = op.lower()
+            if op not in BitDotIOPandas.WHERE_OPS:
+                raise ValueError(f'Unsupported where operator "{op}". Try one of {list(BitDotIOPandas.WHERE_OPS)}.')
+            quoted = self._quote_identifier(col)
+            if op in ('is null', 'is not null'):
+                clauses.append(f'{quoted} {op.upper()}')
+            elif op in ('in', 'not in'):
+                clauses.append(f'{quoted} {op.upper()} %s')
+                params.append(tuple(value))
+            else:
+                clauses.append(f'{quoted} {op.upper()} %s')
+                params.append(value)
+        return ' WHERE ' + ' AND '.join(clauses), params
+
     def _get_api_key(self):
         '''Retrieves API key from ENV or username CLI input, in that order'''
         if os.getenv("BITDOTIO_API_KEY"):
@@ -235,6 +422,133 @@ class BitDotIOPandas:
         self._validate_repo(repo, username)
         self._validate_table(repo, username, table)
             
+    def _execute(self, sql, params=None):
+        '''Runs SQL statements in one transaction, raising on failure'''
+        # Connect to bit.io
+        conn = self._connect()
+        try:
+            # Open cursor with bit.io server
+            cur = conn.cursor()
+            # Execute sql
+            cur.execute(sql, params)
+            # Close cursor
+            cur.close()
+            # Commit the changes (only relevent for write ops)
+            conn.commit()
+        finally:
+            # Closing without a commit rolls back
+            conn.close()
+
+    def _read_sql_chunks(self, sql, params=None, chunksize=10000):
+        '''Streams a query through a server-side cursor, yielding dataframes of up to chunksize rows'''
+        conn = self._connect()
+        try:
+            # A named cursor keeps the result set on the server, so only one chunk is held locally
+            with conn.cursor(name='bitdotio_pandas_stream') as cur:
+                cur.itersize = chunksize
+                cur.execute(sql, params)
+                while True:
+                    rows = cur.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    # Same conversion as pd.read_sql, so e.g. NUMERIC comes back as float, not Decimal
+                    yield pd.DataFrame.from_records(rows, columns=[col[0] for col in cur.description],
+                                                    coerce_float=True)
+        finally:
+            conn.close()
+
+    def _iter_frames(self, df, chunksize):
+        '''Yields non-empty dataframes of at most chunksize rows from a dataframe or iterator of dataframes'''
+        frames = [df] if isinstance(df, pd.DataFrame) else df
+        for frame in frames:
+            step = chunksize if chunksize else frame.shape[0]
+            for chunk_start in range(0, frame.shape[0], max(step, 1)):
+                yield frame.iloc[chunk_start:chunk_start + step, :]
+
+    def _align_dtypes(self, frame, dtypes):
+        '''Casts a chunk's columns to the integer/boolean dtypes the table was created from'''
+        # e.g. an int column with a NaN in a later read_csv chunk is float, and would copy 1.0 into INTEGER
+        casts = {}
+        for col, dtype in dtypes.items():
+            if col not in frame.columns or frame[col].dtype == dtype:
+                continue
+            if pd.api.types.is_integer_dtype(dtype):
+                # Nullable integer, which keeps NaN as a null; raises if values are not integral
+                casts[col] = BitDotIOPandas.NULLABLE_INT_MAP.get(str(dtype), dtype)
+            elif pd.api.types.is_bool_dtype(dtype):
+                casts[col] = 'boolean'
+        return frame.astype(casts) if casts else frame
+
+    def _serialize_frames(self, frames, buffers, stop, dtypes):
+        '''Serializes frames to CSV buffers on a bounded queue, ending with None (or the exception raised)'''
+        def put(item):
+            # Blocks while the queue is full, unless the consumer has stopped
+            while not stop.is_set():
+                try:
+                    buffers.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for frame in frames:
+                frame = self._align_dtypes(frame, dtypes)
+                buffer = io.StringIO()
+                frame.to_csv(buffer, index=False, header=False, na_rep="null", lineterminator="\r\n")
+                buffer.seek(0)
+                if not put(buffer):
+                    return
+            put(None)
+        except Exception as e:
+            put(e)
+
+    def _next_buffer(self, buffers, producer):
+        '''Waits for the next serialized buffer, failing if the producer thread died without finishing'''
+        while True:
+            try:
+                return buffers.get(timeout=1)
+            except queue.Empty:
+                if not producer.is_alive():
+                    try:
+                        return buffers.get_nowait()
+                    except queue.Empty:
+                        raise RuntimeError('Serializing chunks for upload stopped unexpectedly.')
+
+    def _copy_frames(self, fully_qualified, frames, dtypes, max_buffered=2):
+        '''COPYs frames into a table over one connection, serializing the next frame while the current one uploads'''
+        # TODO(doss): this implementation lacks integrity control for partial insert with chunking
+        buffers = queue.Queue(maxsize=max_buffered)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._serialize_frames, args=(frames, buffers, stop, dtypes), daemon=True)
+        producer.start()
+        conn = None
+        n_chunks, n_failed = 0, 0
+        try:
+            conn = self._connect()
+            while True:
+                buffer = self._next_buffer(buffers, producer)
+                if buffer is None:
+                    break
+                if isinstance(buffer, Exception):
+                    raise buffer
+                n_chunks += 1
+                try:
+                    cursor = conn.cursor()
+                    cursor.copy_expert(f"COPY {fully_qualified} FROM STDIN delimiter ',' null as 'null' csv;", buffer)
+                    conn.commit()
+                except (Exception, psycopg2.DatabaseError) as e:
+                    print(e)
+                    conn.rollback()
+                    n_failed += 1
+        finally:
+            stop.set()
+            producer.join()
+            if conn is not None:
+                conn.close()
+        if n_failed:
+            raise ValueError(f'{n_failed} of {n_chunks} chunks failed to upload to {fully_qualified}, see errors above.')
+
     def _get_max_row(self, table, repo, username):
         '''Get maximum row number for a table'''
         username, repo = self._get_username_and_repo(username, repo)
@@ -257,6 +571,24 @@ class BitDotIOPandas:
             sql = sql[:-1] + f' OFFSET {int(offset)};'
         return self.read_sql(sql)
                 
+    def _create_or_insert(self, username, repo, table, select_sql, params, append, columns=None):
+        '''Creates a table from a SELECT, or appends/replaces its rows, in one transaction that raises on failure'''
+        fully_qualified = self._get_fully_qualified(username, repo, table)
+        if table not in self.list_tables(repo, username):
+            statement = f'CREATE TABLE {fully_qualified} AS {select_sql};'
+        else:
+            target = fully_qualified
+            if columns:
+                target += ' (' + ', '.join(self._quote_identifier(col) for col in columns) + ')'
+            if append:
+                statement = f'INSERT INTO {target} {select_sql};'
+            else:
+                # Snapshot the SELECT before deleting, since it may read from the table being replaced
+                statement = (f'CREATE TEMP TABLE bitdotio_pandas_replace ON COMMIT DROP AS {select_sql}; '
+                             f'DELETE FROM {fully_qualified}; '
+                             f'INSERT INTO {target} SELECT * FROM bitdotio_pandas_replace;')
+        self._execute(statement, params)
+
     def _create_table(self, username, repo, table, df):
         '''Automated table creation from a dataframe with limited type handling'''
         fully_qualified = self._get_fully_qualified(username, repo, table)
@@ -267,4 +599,133 @@ class BitDotIOPandas:
         sql += ', '.join(col_types)
         sql += ')'
         self.sql(sql)
-        return None
\ No newline at end of file
+        return None
+
+
+class BitDotIOTable:
+    """Lazy handle on a bit.io table, built with BitDotIOPandas.table.
+
+    Column selection, filters and limits are recorded on a new handle each time and compiled
+    into a single SQL query only when the handle is materialized with to_pandas, head,
+    iter_batches or one of the aggregations. Operations apply in the order they were
+    called, so filtering a limited handle filters only the limited rows.
+
+    Attributes:
+        table (str): The table name in bit.io.
+        repo (str): The repo name in bit.io.
+        username (str): The username in bit.io.
+    """
+
+    def __init__(self, bpd, table, repo, username, columns=None, filters=None, limit=None, base=None):
+        self._bpd = bpd
+        self.table = table
+        self.repo = repo
+        self.username = username
+        self._columns = list(columns) if columns else None
+        self._filters = list(filters) if filters else []
+        self._limit = limit
+        # Optional (sql, params) of an inner query to select from instead of the table
+        self._base = base
+        self._column_cache = None
+
+    def select(self, *columns):
+        '''Selects a subset of columns'''
+        return self._replace(columns=columns)
+
+    def __getitem__(self, key):
+        '''Selects a column or list of columns, like DataFrame indexing'''
+        return self.select(*key) if isinstance(key, (list, tuple)) else self.select(key)
+
+    def where(self, where=None, **equals):
+        '''Adds filters, combined with AND with any existing filters.
+
+        Args:
+            where (dict or list): {col: value} or a list of (col, op, value) tuples, as in
+                BitDotIOPandas.aggregate.
+            equals: Optional col=value equality filters.
+        '''
+        filters = self._bpd._normalize_where(where) + self._bpd._normalize_where(equals)
+        if self._limit is not None:
+            # Filter the limited rows, not the table, by selecting from the limited query
+            return BitDotIOTable(self._bpd, self.table, self.repo, self.username,
+                                 filters=filters, base=self.compile())
+        return self._replace(filters=self._filters + filters)
+
+    def limit(self, n):
+        '''Limits the number of rows'''
+        n = int(n) if self._limit is None else min(int(n), self._limit)
+        return self._replace(limit=n)
+
+    def compile(self):
+        '''Compiles the recorded operations into a (sql, params) pair'''
+        if self._base is None:
+            source, base_params = self._bpd._get_fully_qualified(self.username, self.repo, self.table), []
+        else:
+            base_sql, base_params = self._base
+            source = f'({base_sql}) AS t'
+        select = ', '.join(self._bpd._quote_identifier(col) for col in self._columns) if self._columns else '*'
+        where_sql, params = self._bpd._compile_where(self._filters)
+        sql = f'SELECT {select} FROM {source}{where_sql}'
+        params = list(base_params) + params
+        if self._limit is not None:
+            sql += f' LIMIT {self._limit}'
+        return sql, params
+
+    def to_pandas(self):
+        '''Runs the query and downloads the result as a pandas DataFrame'''
+        sql, params = self.compile()
+        return self._bpd.read_sql(sql + ';', params)
+
+    def head(self, n=5):
+        '''Downloads only the first n rows'''
+        return self.limit(n).to_pandas()
+
+    def iter_batches(self, chunksize=10000):
+        '''Runs the query once and yields pandas DataFrames of up to chunksize rows'''
+        sql, params = self.compile()
+        return self._bpd._read_sql_chunks(sql + ';', params, chunksize=chunksize)
+
+    def count(self):
+        '''Counts rows server-side'''
+        sql, params = self.compile()
+        return int(self._bpd.read_sql(f'SELECT COUNT(*) FROM ({sql}) AS t;', params).values[0][0])
+
+    def agg(self, aggs, by=None, bucket=None):
+        '''Aggregates server-side with the recorded filters, see BitDotIOPandas.aggregate'''
+        if self._limit is not None or self._base is not None:
+            raise ValueError('Aggregations cannot be combined with limit. Aggregate before limiting instead.')
+        return self._bpd.aggregate(self.table, by=by, aggs=aggs, where=self._filters, bucket=bucket,
+                                   repo=self.repo, username=self.username)
+
+    @property
+    def columns(self):
+        '''Column names, from a query that returns no rows'''
+        if self._columns is not None:
+            return list(self._columns)
+        if self._column_cache is None:
+            sql, params = self._replace(limit=0).compile()
+            self._column_cache = list(self._bpd.read_sql(sql + ';', params).columns)
+        return list(self._column_cache)
+
+    @property
+    def shape(self):
+        '''(rows, columns), with rows counted server-side'''
+        return self.count(), len(self.columns)
+
+    def __iter__(self):
+        '''Iterates over column names, like a DataFrame, rather than falling back to __getitem__'''
+        return iter(self.columns)
+
+    def __bool__(self):
+        # A handle is lazy, not a container, so it is always truthy and never counts rows
+        return True
+
+    def __repr__(self):
+        sql, params = self.compile()
+        return f'BitDotIOTable Object: {sql}, params= {params}'
+
+    def _replace(self, **changes):
+        '''Copies this handle with some recorded operations replaced'''
+        state = {'columns': self._columns, 'filters': self._filters, 'limit': self._limit, 'base': self._base}
+        state.update(changes)
+        return BitDotIOTable(self._bpd, self.table, self.repo, self.username, **state)
@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+from bitdotio_pandas import BitDotIOPandas
+
+"""Tests for the SQL that BitDotIOPandas generates, with bit.io stubbed out so nothing is run."""
+
+
+class StubBitDotIOPandas(BitDotIOPandas):
+    '''Records statements instead of running them, and sees the tables it is given'''
+
+    def __init__(self, tables=('src',)):
+        self.username = 'u'
+        self.repo = 'r'
+        self.tables = list(tables)
+        self.statements = []
+
+    def list_tables(self, repo=None, username=None):
+        return self.tables
+
+    def list_repos(self, username=None):
+        return [self.repo]
+
+    def read_sql(self, sql, params=None):
+        self.statements.append((sql, params))
+        return pd.DataFrame({'a': [0], 'b': [0]})
+
+    def _execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+
+@pytest.fixture
+def bpd():
+    return StubBitDotIOPandas()
+
+
+def test_len_and_size_count_rows(bpd):
+    bpd.aggregate('src', by=['store'], aggs={'item': [len, 'size', 'count']})
+    sql, params = bpd.statements[-1]
+    assert sql == ('SELECT "store" AS "store", COUNT(*) AS "item_len", COUNT(*) AS "item_size", '
+                   'COUNT("item") AS "item_count" FROM "u/r"."src" GROUP BY 1 ORDER BY 1;')
+    assert params == []
+
+
+def test_star_only_counts(bpd):
+    bpd.aggregate('src', aggs={'*': 'count'})
+    assert bpd.statements[-1][0] == 'SELECT COUNT(*) AS "count" FROM "u/r"."src";'
+    with pytest.raises(ValueError):
+        bpd.aggregate('src', aggs={'*': 'sum'})
+
+
+def test_bucket_and_where(bpd):
+    bpd.aggregate('src', aggs={'sold': 'sum'}, bucket={'date': 'M'},
+                  where=[('sold', '>', 0), ('store', 'in', [1, 2])])
+    sql, params = bpd.statements[-1]
+    assert sql == ('SELECT date_trunc(\'month\', "date") AS "date", SUM("sold") AS "sold" FROM "u/r"."src" '
+                   'WHERE "sold" > %s AND "store" IN %s GROUP BY 1 ORDER BY 1;')
+    assert params == [0, (1, 2)]
+
+
+def test_identifiers_are_quoted_and_escaped(bpd):
+    bpd.aggregate('src', by=['50% "off"'], aggs={'a%b': 'max'}, where={'c%': None})
+    sql, params = bpd.statements[-1]
+    assert sql == ('SELECT "50%% ""off""" AS "50%% ""off""", MAX("a%%b") AS "a%%b" FROM "u/r"."src" '
+                   'WHERE "c%%" IS NULL GROUP BY 1 ORDER BY 1;')
+    assert params == []
+
+
+def test_table_where_then_limit(bpd):
+    sql, params = bpd.table('src')[['a', 'b']].where(a=1).limit(5).compile()
+    assert sql == 'SELECT "a", "b" FROM "u/r"."src" WHERE "a" = %s LIMIT 5'
+    assert params == [1]
+
+
+def test_table_limit_then_where_filters_the_limited_rows(bpd):
+    sql, params = bpd.table('src').limit(5).where(a=1).compile()
+    assert sql == 'SELECT * FROM (SELECT * FROM "u/r"."src" LIMIT 5) AS t WHERE "a" = %s'
+    assert params == [1]
+    # Params of the inner query come first
+    sql, params = bpd.table('src').where(b=2).limit(5).where(a=1).compile()
+    assert sql == 'SELECT * FROM (SELECT * FROM "u/r"."src" WHERE "b" = %s LIMIT 5) AS t WHERE "a" = %s'
+    assert params == [2, 1]
+
+
+def test_table_count_and_agg(bpd):
+    tbl = bpd.table('src').where(a=1)
+    tbl.count()
+    assert bpd.statements[-1] == ('SELECT COUNT(*) FROM (SELECT * FROM "u/r"."src" WHERE "a" = %s) AS t;', [1])
+    tbl.agg({'b': 'sum'})
+    assert bpd.statements[-1] == ('SELECT SUM("b") AS "b" FROM "u/r"."src" WHERE "a" = %s;', [1])
+    with pytest.raises(ValueError):
+        tbl.limit(5).agg({'b': 'sum'})
+
+
+def test_table_iterates_columns_without_counting(bpd):
+    tbl = bpd.table('src')[['a', 'b']]
+    assert list(tbl) == ['a', 'b']
+    assert tbl
+    assert bpd.statements == []
+    # Unselected columns come from a query returning no rows
+    assert list(bpd.table('src')) == ['a', 'b']
+    assert bpd.statements == [('SELECT * FROM "u/r"."src" LIMIT 0;', [])]
+
+
+def test_copy_table_creates_missing_table(bpd):
+    bpd.copy_table('src', 'dst', columns=['a'], where={'b': [1, 2]})
+    assert bpd.statements[-1] == ('CREATE TABLE "u/r"."dst" AS SELECT "a" FROM "u/r"."src" WHERE "b" IN %s;', [(1, 2)])
+
+
+def test_copy_table_appends_to_existing_table(bpd):
+    bpd.tables.append('dst')
+    bpd.copy_table('src', 'dst', columns=['a'], where={'b': 1})
+    assert bpd.statements[-1] == ('INSERT INTO "u/r"."dst" ("a") SELECT "a" FROM "u/r"."src" WHERE "b" = %s;', [1])
+
+
+def test_copy_table_replaces_in_place_through_temp_table(bpd):
+    bpd.copy_table('src', 'src', where=[('a', '>', 1)], append=False)
+    sql, params = bpd.statements[-1]
+    assert sql == ('CREATE TEMP TABLE bitdotio_pandas_replace ON COMMIT DROP AS SELECT * FROM "u/r"."src" WHERE "a" > %s; '
+                   'DELETE FROM "u/r"."src"; '
+                   'INSERT INTO "u/r"."src" SELECT * FROM bitdotio_pandas_replace;')
+    assert params == [1]
+
+
+def test_create_table_as_strips_semicolon(bpd):
+    bpd.create_table_as('SELECT 1 AS "x%%";', 'dst', params=[])
+    assert bpd.statements[-1] == ('CREATE TABLE "u/r"."dst" AS SELECT 1 AS "x%%";', [])
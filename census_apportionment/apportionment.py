@@ -0,0 +1,157 @@
+import heapq
+import numpy as np
+
+"""This module provides divisor-method apportionment, both one seat at a time by priority value and batched over many scenarios."""
+
+
+def _hh_divisor(seats):
+    '''Huntington-Hill: geometric mean of the current and next seat count'''
+    return np.sqrt(seats * (seats + 1.0))
+
+
+def _webster_divisor(seats):
+    '''Webster: arithmetic mean of the current and next seat count'''
+    return seats + 0.5
+
+
+def _jefferson_divisor(seats):
+    '''Jefferson: the next seat count (rounds quotas down)'''
+    return seats + 1.0
+
+
+def _adams_divisor(seats):
+    '''Adams: the current seat count (rounds quotas up)'''
+    return seats * 1.0
+
+
+# The rounding point d(s) between s and s + 1 seats for each method
+METHODS = {
+    'huntington_hill': _hh_divisor,
+    'webster': _webster_divisor,
+    'jefferson': _jefferson_divisor,
+    'adams': _adams_divisor
+}
+
+
+def apportion(pops, n_seats=435, method='huntington_hill', min_seats=1):
+    '''Apportions seats one at a time to the state with the highest priority value.
+
+    Each state starts with min_seats, then each remaining seat goes to the state with the
+    largest pop / d(seats), where d is the method's rounding point. This is exact and needs
+    exactly one heap operation per seat.
+
+    Args:
+        pops (array-like): Population per state.
+        n_seats (int): Total seats to apportion.
+        method (str): One of METHODS, default 'huntington_hill'.
+        min_seats (int): Seats every state receives before priority allocation, default 1.
+    Returns:
+        A numpy int array of seats per state, in the order of pops.
+    '''
+    divisor = _get_divisor(method)
+    pops = np.asarray(pops, dtype=float)
+    _validate_seats(pops.shape[-1], n_seats, min_seats)
+    seats = np.full(pops.shape[0], min_seats, dtype=int)
+    # heapq is a min-heap, so store negative priorities; the index breaks ties deterministically
+    heap = [(-_priority(pop, divisor(min_seats)), i) for i, pop in enumerate(pops)]
+    heapq.heapify(heap)
+    for _ in range(n_seats - seats.sum()):
+        _, i = heapq.heappop(heap)
+        seats[i] += 1
+        heapq.heappush(heap, (-_priority(pops[i], divisor(seats[i])), i))
+    return seats
+
+
+def apportion_batch(pops, n_seats=435, method='huntington_hill', min_seats=1, max_iter=200):
+    '''Apportions many scenarios at once by searching for each scenario's divisor in parallel.
+
+    A state with quota q = pop / D receives floor(q) + (q > d(floor(q))) seats (at least
+    min_seats), so for each scenario we bisect on D until the seats sum to n_seats. All
+    scenarios are bisected together with NumPy; any scenario left unresolved by an exact
+    tie falls back to apportion.
+
+    Args:
+        pops (array-like): Populations, either (n_states,) shared by every scenario or
+            (n_scenarios, n_states).
+        n_seats (int or array-like): Total seats, either one for every scenario or one per scenario.
+        method (str): One of METHODS, default 'huntington_hill'.
+        min_seats (int): Seats every state receives at minimum, default 1.
+        max_iter (int): Maximum bisection steps before falling back to apportion.
+    Returns:
+        A numpy int array of seats with shape (n_scenarios, n_states), or (n_states,) if both
+        pops and n_seats describe a single scenario.
+    '''
+    divisor = _get_divisor(method)
+    pops = np.asarray(pops, dtype=float)
+    n_seats = np.asarray(n_seats, dtype=int)
+    single = pops.ndim == 1 and n_seats.ndim == 0
+    pops = np.atleast_2d(pops)
+    n_scenarios = max(pops.shape[0], n_seats.size)
+    pops = np.broadcast_to(pops, (n_scenarios, pops.shape[1]))
+    n_seats = np.broadcast_to(n_seats.reshape(-1), (n_scenarios,))
+    _validate_seats(pops.shape[1], n_seats.min(), min_seats)
+
+    def seats_for(divisors):
+        quotas = pops / divisors[:, None]
+        floors = np.floor(quotas)
+        return np.maximum(floors + (quotas > divisor(floors)), min_seats).astype(int)
+
+    # Seats are non-increasing in D: lo gives at least n_seats, hi at most n_seats
+    totals = pops.sum(axis=1)
+    lo = totals / (n_seats + 2.0 * pops.shape[1])
+    hi = 2.0 * totals
+    seats = seats_for(lo)
+    done = seats.sum(axis=1) == n_seats
+    for _ in range(max_iter):
+        if done.all():
+            break
+        mid = np.sqrt(lo * hi)
+        mid_seats = seats_for(mid)
+        mid_totals = mid_seats.sum(axis=1)
+        found = ~done & (mid_totals == n_seats)
+        seats[found] = mid_seats[found]
+        done |= found
+        lo = np.where(mid_totals > n_seats, mid, lo)
+        hi = np.where(mid_totals < n_seats, mid, hi)
+
+    for k in np.flatnonzero(~done):
+        seats[k] = apportion(pops[k], n_seats[k], method, min_seats)
+    return seats[0] if single else seats
+
+
+def huntington_hill(pops, n_seats=435):
+    '''Huntington-Hill (method of equal proportions), used for the US House since 1941'''
+    return apportion(pops, n_seats, 'huntington_hill')
+
+
+def webster(pops, n_seats=435):
+    '''Webster (Sainte-Laguë divisors), rounding quotas at the arithmetic mean'''
+    return apportion(pops, n_seats, 'webster')
+
+
+def jefferson(pops, n_seats=435):
+    '''Jefferson (D'Hondt divisors), rounding quotas down'''
+    return apportion(pops, n_seats, 'jefferson')
+
+
+def adams(pops, n_seats=435):
+    '''Adams, rounding quotas up'''
+    return apportion(pops, n_seats, 'adams')
+
+
+def _get_divisor(method):
+    '''Looks up a method's rounding point function'''
+    if method not in METHODS:
+        raise ValueError(f'Unknown apportionment method "{method}". Try one of {list(METHODS)}.')
+    return METHODS[method]
+
+
+def _validate_seats(n_states, n_seats, min_seats):
+    '''Checks that the minimum seats per state can be honored'''
+    if n_seats < n_states * min_seats:
+        raise ValueError(f'Cannot apportion {n_seats} seats with at least {min_seats} for each of {n_states} states.')
+
+
+def _priority(pop, rounding_point):
+    '''Priority value of a state's next seat, infinite when it has none yet under Adams/Huntington-Hill'''
+    return pop / rounding_point if rounding_point > 0 else np.inf
@@ -0,0 +1,80 @@
+import numpy as np
+from apportionment import METHODS, apportion, apportion_batch, huntington_hill, webster
+
+"""apportion and apportion_batch should reproduce the census_apportionment notebook's hh() and webster(), and agree with each other for every method."""
+
+
+def divisor_search_hh(n_seats, pops):
+    '''The notebook's original hh(), moving the divisor by 1 until the seats add up'''
+    total_population = sum(pops)
+    divisor = total_population / n_seats
+    quota = np.array(pops) / divisor
+    allocated_seats = np.modf(quota)[1]
+    geom_mean = np.sqrt(allocated_seats * (allocated_seats + 1))
+    allocated_seats[quota > geom_mean] += 1
+
+    while allocated_seats.sum() != n_seats:
+        if allocated_seats.sum() > n_seats:
+            divisor += 1
+        else:
+            divisor -= 1
+
+        quota = np.array(pops) / divisor
+        allocated_seats = np.modf(quota)[1]
+        geom_mean = np.sqrt(allocated_seats * (allocated_seats + 1))
+        allocated_seats[quota > geom_mean] += 1
+
+    return allocated_seats
+
+
+def divisor_search_webster(n_seats, pops):
+    '''The notebook's original webster(), moving the divisor by 1 until the seats add up'''
+    total_population = sum(pops)
+    divisor = total_population / n_seats
+    allocated_seats = np.round(np.array(pops) / divisor, 0)
+    allocated_seats[allocated_seats == 0] = 1
+    while allocated_seats.sum() != n_seats:
+        if allocated_seats.sum() > n_seats:
+            divisor += 1
+        else:
+            divisor -= 1
+
+        allocated_seats = np.round(np.array(pops) / divisor, 0)
+        allocated_seats[allocated_seats == 0] = 1
+
+    return allocated_seats
+
+
+def make_pops(n_scenarios, n_states=50, seed=0):
+    '''Random integer state populations with a US-like spread'''
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(15, 1, (n_scenarios, n_states)).astype(int)
+
+
+def test_matches_divisor_search():
+    for pops in make_pops(25):
+        assert (huntington_hill(pops, 435) == divisor_search_hh(435, pops)).all()
+        assert (webster(pops, 435) == divisor_search_webster(435, pops)).all()
+
+
+def test_batch_matches_heap():
+    pops = make_pops(200, seed=1)
+    for method in METHODS:
+        seats = apportion_batch(pops, 435, method)
+        assert (seats.sum(axis=1) == 435).all()
+        for k in range(pops.shape[0]):
+            assert (seats[k] == apportion(pops[k], 435, method)).all(), (method, k)
+
+
+def test_batch_over_seat_totals():
+    pops = make_pops(1, seed=2)[0]
+    totals = np.arange(50, 800, 7)
+    for method in METHODS:
+        seats = apportion_batch(pops, totals, method)
+        for n_seats, row in zip(totals, seats):
+            assert (row == apportion(pops, n_seats, method)).all(), (method, n_seats)
+
+
+def test_batch_ties_fall_back_to_heap():
+    assert (apportion_batch([10, 10, 10], 4) == apportion([10, 10, 10], 4)).all()
+
@@ -0,0 +1,116 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+"""This module provides vectorized helpers for multi-value string columns, like "Subjects" in the SPL checkouts data."""
+
+
+def split_multi_value(values, sep=', '):
+    '''Splits a multi-value string column into one entry per value.
+
+    Args:
+        values (array-like): The column to split, missing values are skipped.
+        sep (str): The separator between values in a cell.
+    Returns:
+        A tuple (positions, tokens) of numpy arrays, where positions[i] is the row position
+        in values that tokens[i] came from.
+    '''
+    exploded = pd.Series(values, dtype=object).dropna().str.split(sep).explode()
+    return exploded.index.to_numpy(), exploded.to_numpy()
+
+
+def count_values(df, col, weights=None, by=None, sep=', ', n_jobs=1, n_chunks=None):
+    '''Counts (or sums weights for) each value of a multi-value string column.
+
+    Args:
+        df (Pandas DataFrame): The dataframe containing the column.
+        col (str): The multi-value column, e.g. 'Subjects'.
+        weights (str): Optional numeric column to sum per value, e.g. 'Checkouts'. If not
+            provided, each row counts once.
+        by (str): Optional column to count separately for each group of, e.g. 'MaterialType'.
+        sep (str): The separator between values in a cell.
+        n_jobs (int): Number of worker processes, default 1 (no pool). None uses all CPUs.
+        n_chunks (int): Number of chunks to split the rows into for the pool, default 4 per worker.
+    Returns:
+        A pandas Series indexed by value and sorted descending if by is not provided, else a
+        pandas DataFrame indexed by value with one column per group.
+    '''
+    values = df[col].to_numpy()
+    weight_values = df[weights].to_numpy() if weights is not None else None
+    group_values = df[by].to_numpy() if by is not None else None
+
+    n_jobs = n_jobs if n_jobs is not None else os.cpu_count()
+    if n_jobs <= 1:
+        partials = [_count_chunk(values, weight_values, group_values, sep)]
+    else:
+        n_chunks = n_chunks if n_chunks else 4 * n_jobs
+        bounds = np.linspace(0, len(values), n_chunks + 1).astype(int)
+        chunks = list(zip(bounds[:-1], bounds[1:]))
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            partials = list(pool.map(
+                _count_chunk,
+                [values[start:end] for start, end in chunks],
+                [weight_values[start:end] if weights is not None else None for start, end in chunks],
+                [group_values[start:end] if by is not None else None for start, end in chunks],
+                [sep] * len(chunks)))
+
+    counts = pd.concat(partials)
+    counts = counts.groupby(level=list(range(counts.index.nlevels))).sum()
+    if by is None:
+        counts.index.name = col
+        return counts.sort_values(ascending=False)
+    counts.index.names = [col, by]
+    return counts.unstack(fill_value=0)
+
+
+def one_hot(df, col, values, sep=', ', exact=False):
+    '''Flags which of the given values each row's multi-value column contains, in a single pass.
+
+    By default this matches Series.str.contains(value, regex=False), so "Fiction" also flags
+    "Juvenile Fiction". Each check runs once per distinct cell rather than once per row.
+
+    Args:
+        df (Pandas DataFrame): The dataframe containing the column.
+        col (str): The multi-value column, e.g. 'Subjects'.
+        values (iterable): The values to create columns for.
+        sep (str): The separator between values in a cell, only used if exact.
+        exact (bool): Whether values must match a whole entry instead of any substring.
+    Returns:
+        A pandas DataFrame aligned with df, with one column per value. Rows with a missing
+        column value match str.contains (NaN for object columns), otherwise columns are boolean.
+    '''
+    values = list(values)
+    codes, uniques = pd.factorize(df[col])
+    uniques = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+    # One extra all-False row, so missing values (code -1) index it
+    unique_flags = np.zeros((len(uniques) + 1, len(values)), dtype=bool)
+    if exact:
+        positions, tokens = split_multi_value(uniques, sep)
+        value_codes = pd.Index(values).get_indexer(tokens)
+        matched = value_codes >= 0
+        unique_flags[positions[matched], value_codes[matched]] = True
+    else:
+        for i, value in enumerate(values):
+            unique_flags[:-1, i] = uniques.str.contains(value, regex=False).to_numpy(dtype=bool)
+    flags = pd.DataFrame(unique_flags[codes], index=df.index, columns=values)
+    missing = np.flatnonzero(codes < 0)
+    # Missing cells get whatever str.contains gives them for this dtype (NaN for object columns)
+    if len(missing) and not _missing_contains_false(df[col]):
+        flags = flags.astype(object)
+        flags.iloc[missing] = np.nan
+    return flags
+
+
+def _count_chunk(values, weights, groups, sep):
+    '''Sums weights per value (and group) for one chunk of rows'''
+    positions, tokens = split_multi_value(values, sep)
+    chunk_weights = weights[positions] if weights is not None else np.ones(len(positions), dtype='int64')
+    keys = [tokens] if groups is None else [tokens, groups[positions]]
+    return pd.Series(chunk_weights).groupby(keys).sum()
+
+
+def _missing_contains_false(column):
+    '''Whether str.contains returns False (rather than NaN) for missing values of this column's dtype'''
+    result = pd.Series([None], dtype=column.dtype).str.contains('', regex=False).iloc[0]
+    return result is False or result is np.False_
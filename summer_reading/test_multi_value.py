@@ -0,0 +1,75 @@
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from multi_value import count_values, one_hot
+
+"""Compares count_values and one_hot on synthetic SPL-style checkouts with the iterrows loop and str.contains calls from summer_reading_pipeline."""
+
+SUBJECTS = ['Fiction', 'Juvenile Fiction', 'Science Fiction', 'Historical Fiction', 'Nonfiction',
+            'Romance', 'Thriller', 'Biography & Autobiography']
+
+
+def make_checkouts(n_rows=5000, seed=0):
+    '''Builds synthetic checkouts shaped like the SPL data, including missing subjects'''
+    rng = np.random.default_rng(seed)
+    subjects = [', '.join(rng.choice(SUBJECTS, rng.integers(1, 4), replace=False)) if rng.random() > 0.05 else np.nan
+                for _ in range(n_rows)]
+    return pd.DataFrame({
+        'Subjects': subjects,
+        'MaterialType': rng.choice(['EBOOK', 'AUDIOBOOK'], n_rows),
+        'Checkouts': rng.integers(1, 50, n_rows)
+    })
+
+
+def iterrows_counts(df):
+    '''The summer_reading_pipeline subject count loop this module replaced'''
+    subject_counts_ab = defaultdict(int)
+    subject_counts_eb = defaultdict(int)
+    for idx, row in df.iterrows():
+        if isinstance(row.Subjects, str):
+            temp_subjects = row.Subjects.split(', ')
+            for subject in temp_subjects:
+                if row.MaterialType == 'EBOOK':
+                    subject_counts_eb[subject] += row.Checkouts
+                elif row.MaterialType == 'AUDIOBOOK':
+                    subject_counts_ab[subject] += row.Checkouts
+    return subject_counts_ab, subject_counts_eb
+
+
+def test_count_values_matches_iterrows():
+    df = make_checkouts()
+    expected_ab, expected_eb = iterrows_counts(df)
+    for n_jobs in [1, 2]:
+        counts = count_values(df, 'Subjects', weights='Checkouts', by='MaterialType', n_jobs=n_jobs)
+        assert counts['AUDIOBOOK'][counts['AUDIOBOOK'] > 0].to_dict() == dict(expected_ab)
+        assert counts['EBOOK'][counts['EBOOK'] > 0].to_dict() == dict(expected_eb)
+
+
+def test_count_values_unweighted():
+    df = make_checkouts()
+    counts = count_values(df, 'Subjects')
+    exploded = df['Subjects'].dropna().str.split(', ').explode()
+    assert counts.to_dict() == exploded.value_counts().to_dict()
+
+
+def test_one_hot_matches_str_contains():
+    df = make_checkouts()
+    # Object columns (as read by older pandas) keep NaN for missing cells in str.contains
+    for df in [df, df.astype({'Subjects': object})]:
+        flags = one_hot(df, 'Subjects', SUBJECTS)
+        for subject in SUBJECTS:
+            expected = df['Subjects'].str.contains(subject, regex=False)
+            pd.testing.assert_series_equal(flags[subject], expected, check_names=False, check_dtype=False)
+
+
+def test_one_hot_exact():
+    df = make_checkouts()
+    flags = one_hot(df, 'Subjects', SUBJECTS, exact=True)
+    entries = df['Subjects'].str.split(', ')
+    # Missing cells follow str.contains for the column's dtype
+    missing = df['Subjects'].str.contains('', regex=False)[df['Subjects'].isna()]
+    for subject in SUBJECTS:
+        expected = entries.apply(lambda cell: subject in cell if isinstance(cell, list) else np.nan)
+        expected[missing.index] = missing
+        pd.testing.assert_series_equal(flags[subject], expected, check_names=False, check_dtype=False)
+